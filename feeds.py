@@ -0,0 +1,24 @@
+# feeds.py
+
+import backtrader as bt
+
+class NumpyOHLCV(bt.feeds.DataBase):
+    """Data feed streaming bars straight from a (datenum, OHLCV) array, typically memory-mapped."""
+
+    def start(self):
+        super().start()
+        self._idx = 0
+
+    def _load(self):
+        if self._idx >= len(self.p.dataname):
+            return False
+        row = self.p.dataname[self._idx]
+        self._idx += 1
+        self.lines.datetime[0] = row[0]
+        self.lines.open[0] = row[1]
+        self.lines.high[0] = row[2]
+        self.lines.low[0] = row[3]
+        self.lines.close[0] = row[4]
+        self.lines.volume[0] = row[5]
+        self.lines.openinterest[0] = 0.0
+        return True
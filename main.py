@@ -1,17 +1,134 @@
 import click
-import yfinance as yf
+import numpy as np
 import pandas as pd
-import backtrader as bt
-import matplotlib.pyplot as plt
-import json
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
+import talib
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+from scipy.signal import lfilter
+import pyarrow as pa
+from pyarrow import csv as pacsv
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+import hashlib
 import os
 
-# Ensure the 'reports' directory exists
-os.makedirs('reports', exist_ok=True)
-os.makedirs('backtest_results', exist_ok=True)
-os.makedirs('results', exist_ok=True)
+# Heavy, command-specific dependencies (yfinance, backtrader, mplfinance,
+# jinja2, weasyprint) are imported inside the commands that use them, so every
+# other invocation skips their import cost.
+
+# Downloaded history is cached here as zstd parquet, keyed by (symbol, start, end)
+_CACHE_DIR = Path.home() / '.cache' / 'quantcli'
+
+# Shared template environment: compiled template bytecode persists across processes,
+# so repeat report runs skip the parse entirely
+_JINJA = None
+
+def _jinja_env():
+    global _JINJA
+    if _JINJA is None:
+        from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+        _JINJA = Environment(
+            loader=FileSystemLoader('.'),
+            bytecode_cache=FileSystemBytecodeCache(),
+            auto_reload=False,
+        )
+    return _JINJA
+
+def _cache_path(symbol, start, end):
+    key = hashlib.sha1(f'{symbol}|{start}|{end}'.encode()).hexdigest()
+    return _CACHE_DIR / f'{key}.parquet'
+
+def _load_ohlcv(path):
+    """Parse an OHLCV CSV with Arrow's multithreaded reader; buffers move to pandas zero-copy."""
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(column_types={'Date': pa.timestamp('ns')}),
+    )
+    return table.to_pandas(self_destruct=True).set_index('Date')
+
+_FEED_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def _feed_array(path):
+    """Return the (datenum, OHLCV) float64 array for a CSV, cached as a .npy sibling.
+
+    The cache is rebuilt whenever the CSV is newer and loaded memory-mapped, so
+    repeat runs (e.g. parameter sweeps) skip both the parse and the
+    DataFrame-to-lines conversion.
+    """
+    import backtrader as bt
+
+    npy_path = path + '.npy'
+    if not (os.path.exists(npy_path) and os.path.getmtime(npy_path) >= os.path.getmtime(path)):
+        df = _load_ohlcv(path)
+        arr = np.empty((len(df), 6), dtype=np.float64)
+        arr[:, 0] = [bt.date2num(dt) for dt in df.index.to_pydatetime()]
+        arr[:, 1:] = df[_FEED_COLUMNS].to_numpy(dtype=np.float64)
+        np.save(npy_path, arr)
+    return np.load(npy_path, mmap_mode='r')
+
+def _write_csv(df, path):
+    """Write a DataFrame through Arrow's parallel CSV writer; pandas' writer formats per cell in Python."""
+    pacsv.write_csv(pa.Table.from_pandas(df.reset_index()), path)
+
+def _ema(values, span):
+    """EMA (adjust=False) as a first-order IIR filter: one C pass over the array."""
+    alpha = 2.0 / (span + 1.0)
+    return lfilter([alpha], [1.0, alpha - 1.0], values, zi=[values[0] * (1.0 - alpha)])[0]
+
+if njit is not None:
+    # Explicit signature compiles at import and lands in the on-disk cache,
+    # so no per-invocation JIT cost on warm starts
+    @njit('void(float64[:], int64, float64[:])', cache=True, fastmath=True, boundscheck=False)
+    def _rsi(close, period, out):
+        """Single-pass Wilder RSI: running avg gain/loss in scalars, no intermediate arrays."""
+        n = close.shape[0]
+        out[:min(period, n)] = np.nan
+        if n <= period:
+            return
+        gain = 0.0
+        loss = 0.0
+        for i in range(1, period + 1):
+            d = close[i] - close[i - 1]
+            if d > 0.0:
+                gain += d
+            else:
+                loss -= d
+        gain /= period
+        loss /= period
+        # loss == 0.0 (an all-gain window) must be guarded explicitly: fastmath
+        # forbids relying on inf propagation from the division
+        out[period] = 100.0 if loss == 0.0 else 100.0 - 100.0 / (1.0 + gain / loss)
+        for i in range(period + 1, n):
+            d = close[i] - close[i - 1]
+            g = d if d > 0.0 else 0.0
+            l = -d if d < 0.0 else 0.0
+            gain = (gain * (period - 1) + g) / period
+            loss = (loss * (period - 1) + l) / period
+            out[i] = 100.0 if loss == 0.0 else 100.0 - 100.0 / (1.0 + gain / loss)
+else:
+    def _rsi(close, period, out):
+        """Wilder RSI without Numba: the smoother is a first-order IIR filter
+        (alpha = 1/period), so lfilter reproduces the kernel's values exactly."""
+        n = close.shape[0]
+        out[:min(period, n)] = np.nan
+        if n <= period:
+            return
+        delta = np.diff(close)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        k = (period - 1.0) / period
+        seed_gain = gains[:period].mean()
+        seed_loss = losses[:period].mean()
+        avg_gain = np.concatenate(([seed_gain], lfilter([1.0 / period], [1.0, -k], gains[period:], zi=[seed_gain * k])[0]))
+        avg_loss = np.concatenate(([seed_loss], lfilter([1.0 / period], [1.0, -k], losses[period:], zi=[seed_loss * k])[0]))
+        # Zero average loss means RSI 100, matching the kernel's guard without
+        # a divide-by-zero RuntimeWarning
+        safe_loss = np.where(avg_loss == 0.0, 1.0, avg_loss)
+        out[period:] = np.where(avg_loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / safe_loss))
 
 @click.group()
 def cli():
@@ -19,19 +136,53 @@ def cli():
     pass
 
 @cli.command()
-@click.option('--symbol', required=True, help='Stock symbol to fetch data for.')
+@click.option('--symbol', 'symbols', required=True, multiple=True, help='Stock symbol to fetch data for; repeat the flag to fetch several in one call.')
 @click.option('--start', required=True, help='Start date (YYYY-MM-DD).')
 @click.option('--end', required=True, help='End date (YYYY-MM-DD).')
-@click.option('--output', required=True, type=click.Path(), help='Output CSV file path.')
-def fetch(symbol, start, end, output):
-    """Fetch historical data for a given symbol."""
-    click.echo(f'Fetching data for {symbol} from {start} to {end}...')
-    data = yf.download(symbol, start=start, end=end)
-    if data.empty:
+@click.option('--output', required=True, type=click.Path(), help='Output CSV file path (a directory when fetching multiple symbols).')
+@click.option('--refresh', is_flag=True, default=False, help='Ignore the local cache and re-download.')
+def fetch(symbols, start, end, output, refresh):
+    """Fetch historical data for one or more symbols."""
+    import yfinance as yf
+
+    frames = {}
+    missing = []
+    for symbol in symbols:
+        cache = _cache_path(symbol, start, end)
+        if cache.exists() and not refresh:
+            click.echo(f'Loading cached data for {symbol} from {start} to {end}...')
+            frames[symbol] = pd.read_parquet(cache)
+        else:
+            missing.append(symbol)
+
+    if missing:
+        click.echo(f'Fetching data for {", ".join(missing)} from {start} to {end}...')
+        # One batched call: yfinance downloads the symbols on parallel threads
+        data = yf.download(list(missing), start=start, end=end, group_by='ticker', threads=True)
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for symbol in missing:
+            # yfinance >= 0.2.51 returns MultiIndex columns even for a single
+            # ticker, so key the slice on the actual shape, not len(missing)
+            part = data[symbol].dropna(how='all') if isinstance(data.columns, pd.MultiIndex) else data
+            if part.empty:
+                click.echo(f'No data fetched for {symbol}. Please check the symbol and date range.')
+                continue
+            part.to_parquet(_cache_path(symbol, start, end), compression='zstd')
+            frames[symbol] = part
+
+    if not frames:
         click.echo('No data fetched. Please check the symbol and date range.')
         return
-    data.to_csv(output)
-    click.echo(f'Data saved to {output}')
+
+    if len(symbols) == 1:
+        _write_csv(frames[symbols[0]], output)
+        click.echo(f'Data saved to {output}')
+    else:
+        os.makedirs(output, exist_ok=True)
+        for symbol, frame in frames.items():
+            path = os.path.join(output, f'{symbol}.csv')
+            _write_csv(frame, path)
+            click.echo(f'Data saved to {path}')
 
 @cli.command()
 @click.option('--type', 'indicator_type', required=True, type=click.Choice(['SMA', 'EMA', 'RSI', 'MACD'], case_sensitive=False), help='Type of indicator to calculate.')
@@ -42,96 +193,187 @@ def fetch(symbol, start, end, output):
 def indicator(indicator_type, symbol, period, data, output):
     """Calculate technical indicators."""
     click.echo(f'Calculating {indicator_type} for {symbol}...')
-    df = pd.read_csv(data, index_col='Date', parse_dates=True)
-    
+    df = _load_ohlcv(data)
+    close = df['Close'].to_numpy(dtype=np.float64, copy=False)
+
     if indicator_type.upper() == 'SMA':
-        df['SMA'] = df['Close'].rolling(window=period).mean()
+        df['SMA'] = talib.SMA(close, timeperiod=period)
+        start = period - 1
     elif indicator_type.upper() == 'EMA':
-        df['EMA'] = df['Close'].ewm(span=period, adjust=False).mean()
+        # The IIR-filter EMA seeds from the first close, so there is no warm-up
+        df['EMA'] = _ema(close, period)
+        start = 0
     elif indicator_type.upper() == 'RSI':
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+        out = np.empty_like(close)
+        _rsi(close, period, out)
+        df['RSI'] = out
+        start = period
     elif indicator_type.upper() == 'MACD':
-        ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = ema12 - ema26
-        df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    
-    df.dropna(inplace=True)
-    df.to_csv(output)
+        macd = _ema(close, 12) - _ema(close, 26)
+        df['MACD'] = macd
+        df['Signal'] = _ema(macd, 9)
+        start = 0
+
+    # Warm-up rows sit at a known offset, so slice a view instead of scanning for NaNs
+    if start:
+        df = df.iloc[start:]
+    _write_csv(df, output)
     click.echo(f'Indicator data saved to {output}')
 
 @cli.command()
-@click.option('--strategy', required=True, type=click.Choice(['ma_crossover'], case_sensitive=False), help='Trading strategy to backtest.')
+@click.option('--strategy', required=True, type=click.Choice(['ma_crossover', 'ma_crossover_vec'], case_sensitive=False), help='Trading strategy to backtest.')
 @click.option('--symbol', required=True, help='Stock symbol.')
 @click.option('--data', required=True, type=click.Path(exists=True), help='Path to the input CSV data file.')
 @click.option('--output', default='backtest_results', type=click.Path(), help='Output directory for backtest results.')
-def backtest(strategy, symbol, data, output):
+@click.option('--plot/--no-plot', default=False, help='Render the candlestick plot (off by default; rendering often costs more than the backtest).')
+def backtest(strategy, symbol, data, output, plot):
     """Backtest a trading strategy."""
     click.echo(f'Backtesting {strategy} strategy for {symbol}...')
-    cerebro = bt.Cerebro()
-
-    # Load data
-    df = pd.read_csv(data, index_col='Date', parse_dates=True)
-    data_feed = bt.feeds.PandasData(dataname=df)
-    cerebro.adddata(data_feed)
-
-    # Add strategy
-    if strategy.lower() == 'ma_crossover':
-        from strategies.ma_crossover import MovingAverageCrossover
-        cerebro.addstrategy(MovingAverageCrossover)
-
-    # Set initial cash
-    cerebro.broker.setcash(100000.0)
-
-    # Add analyzers
-    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-
-    # Run backtest
-    results = cerebro.run()
-    strat = results[0]
-
-    # Get analyzers
-    sharpe = strat.analyzers.sharpe.get_analysis()
-    drawdown = strat.analyzers.drawdown.get_analysis()
-
-    # Save results
-    result_summary = {
-        'Sharpe Ratio': sharpe.get('sharperatio', None),
-        'Max Drawdown': drawdown.get('max', None),
-        'Drawdown Period': drawdown.get('len', None)
-    }
-
-    with open(os.path.join(output, f'{symbol}_backtest_results.json'), 'w') as f:
-        json.dump(result_summary, f, indent=4)
-
-    # Plot and save the graph
-    cerebro.plot(style='candlestick', savefig=os.path.join(output, f'{symbol}_backtest_plot.png'))
-    
+    _run_one(strategy, symbol, data, output, plot=plot)
     click.echo(f'Backtest results saved to {output}')
 
+def _run_one(strategy, symbol, data, output, plot=True):
+    """Run a single backtest and return its result summary. Shared by backtest and backtest-batch."""
+    import backtrader as bt
+
+    # Load data (parsed once per CSV, then served from the .npy cache)
+    arr = _feed_array(data)
+
+    if strategy.lower() == 'ma_crossover_vec':
+        # One-shot NumPy path: no bar-by-bar event loop, no plotting
+        from strategies.ma_crossover_vec import run as run_vectorized
+        cerebro = None
+        result_summary = run_vectorized(np.ascontiguousarray(arr[:, 4]))
+    else:
+        from feeds import NumpyOHLCV
+
+        cerebro = bt.Cerebro()
+        data_feed = NumpyOHLCV(dataname=arr)
+        cerebro.adddata(data_feed)
+
+        # Add strategy
+        if strategy.lower() == 'ma_crossover':
+            from strategies.ma_crossover import MovingAverageCrossover
+            cerebro.addstrategy(MovingAverageCrossover)
+
+        # Set initial cash
+        cerebro.broker.setcash(100000.0)
+
+        # Add analyzers
+        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
+        cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+
+        # Run backtest
+        results = cerebro.run()
+        strat = results[0]
+
+        # Get analyzers
+        sharpe = strat.analyzers.sharpe.get_analysis()
+        drawdown = strat.analyzers.drawdown.get_analysis()
+
+        # Save results
+        result_summary = {
+            'Sharpe Ratio': sharpe.get('sharperatio', None),
+            'Max Drawdown': drawdown.get('max', None),
+            'Drawdown Period': drawdown.get('len', None)
+        }
+
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, f'{symbol}_backtest_results.json'), 'wb') as f:
+        f.write(orjson.dumps(result_summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+    # Plot and save the graph (opt-in; always skipped in batch workers since
+    # matplotlib is not fork-safe everywhere)
+    if plot and cerebro is not None:
+        cerebro.plot(style='candlestick', savefig=os.path.join(output, f'{symbol}_backtest_plot.png'))
+
+    return result_summary
+
+@cli.command('backtest-batch')
+@click.option('--strategy', required=True, type=click.Choice(['ma_crossover', 'ma_crossover_vec'], case_sensitive=False), help='Trading strategy to backtest.')
+@click.option('--manifest', required=True, type=click.Path(exists=True), help='Path to a JSON manifest mapping symbols to CSV data files.')
+@click.option('--output', default='backtest_results', type=click.Path(), help='Output directory for backtest results.')
+def backtest_batch(strategy, manifest, output):
+    """Backtest a strategy for many symbols in parallel."""
+    with open(manifest, 'rb') as f:
+        entries = orjson.loads(f.read())
+
+    symbols = list(entries)
+    datas = [entries[symbol] for symbol in symbols]
+    click.echo(f'Backtesting {strategy} strategy for {len(symbols)} symbols on {os.cpu_count()} workers...')
+
+    # Each worker loads its own data from disk, so no DataFrames cross the process boundary
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(_run_one, repeat(strategy), symbols, datas, repeat(output), repeat(False))
+        for symbol, summary in zip(symbols, results):
+            click.echo(f'{symbol}: Sharpe Ratio {summary["Sharpe Ratio"]}')
+
+    click.echo(f'Batch backtest results saved to {output}')
+
+@cli.command()
+@click.option('--symbol', required=True, help='Stock symbol.')
+@click.option('--data', required=True, type=click.Path(exists=True), help='Path to the input CSV data file.')
+@click.option('--output', default='backtest_results', type=click.Path(), help='Output directory for the plot.')
+def plot(symbol, data, output):
+    """Render a candlestick chart for a symbol's data."""
+    import mplfinance as mpf
+
+    click.echo(f'Plotting {symbol}...')
+    df = _load_ohlcv(data)
+    os.makedirs(output, exist_ok=True)
+    plot_path = os.path.join(output, f'{symbol}_backtest_plot.png')
+    mpf.plot(df, type='candle', volume=True, savefig=plot_path)
+    click.echo(f'Plot saved to {plot_path}')
+
 @cli.command()
 @click.option('--portfolio', required=True, type=click.Path(exists=True), help='Path to the portfolio JSON file.')
-@click.option('--output', required=True, type=click.Path(), help='Output report file path (e.g., report.pdf).')
-def report(portfolio, output):
+@click.option('--output', required=True, type=click.Path(), help='Output report file path (e.g., report.html or report.pdf).')
+@click.option('--format', 'fmt', type=click.Choice(['pdf', 'html']), default='html', help='Report format; pdf loads the full WeasyPrint rendering stack.')
+def report(portfolio, output, fmt):
     """Generate a performance report."""
     click.echo(f'Generating report from {portfolio}...')
-    with open(portfolio, 'r') as f:
-        portfolio_data = json.load(f)
-    
+    with open(portfolio, 'rb') as f:
+        portfolio_data = orjson.loads(f.read())
+
     # For simplicity, assume portfolio_data contains backtest results
     # You can expand this to include more detailed analysis
-    env = Environment(loader=FileSystemLoader('.'))
-    template = env.get_template('reports/report_template.html')
+    template = _jinja_env().get_template('reports/report_template.html')
     html_out = template.render(portfolio=portfolio_data)
 
-    # Generate PDF
-    HTML(string=html_out).write_pdf(output)
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    if fmt == 'pdf':
+        from weasyprint import HTML
+        HTML(string=html_out).write_pdf(output)
+    else:
+        with open(output, 'w') as f:
+            f.write(html_out)
     click.echo(f'Report generated at {output}')
 
+@cli.command('report-batch')
+@click.option('--portfolio-dir', required=True, type=click.Path(exists=True), help='Directory of portfolio JSON files.')
+@click.option('--output-dir', required=True, type=click.Path(), help='Directory for the generated PDF reports.')
+def report_batch(portfolio_dir, output_dir):
+    """Generate PDF reports for every portfolio JSON in a directory."""
+    from weasyprint import HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    os.makedirs(output_dir, exist_ok=True)
+    # One FontConfiguration shared across renders amortizes font loading
+    font_config = FontConfiguration()
+    template = _jinja_env().get_template('reports/report_template.html')
+
+    count = 0
+    for name in sorted(os.listdir(portfolio_dir)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(portfolio_dir, name), 'rb') as f:
+            portfolio_data = orjson.loads(f.read())
+        html_out = template.render(portfolio=portfolio_data)
+        out_path = os.path.join(output_dir, name[:-len('.json')] + '.pdf')
+        HTML(string=html_out).write_pdf(out_path, font_config=font_config)
+        count += 1
+
+    click.echo(f'{count} reports generated in {output_dir}')
+
 if __name__ == '__main__':
     cli()
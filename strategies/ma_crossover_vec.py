@@ -0,0 +1,53 @@
+# strategies/ma_crossover_vec.py
+
+import numpy as np
+import talib
+
+def run(close, short=50, long=200, cash=100000.0):
+    """Vectorized long-only moving-average crossover backtest.
+
+    Same signals as MovingAverageCrossover, but computed in one shot on the
+    close array: TA-Lib SMAs, a sign-diff for entries/exits, and a
+    cumulative-product equity curve instead of Backtrader's bar-by-bar loop.
+    Returns the same summary keys the backtest command writes out.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    short_ma = talib.SMA(close, timeperiod=short)
+    long_ma = talib.SMA(close, timeperiod=long)
+
+    cross = np.sign(short_ma - long_ma)
+    cross[np.isnan(cross)] = 0.0
+    entries = np.diff(cross) == 2
+    exits = np.diff(cross) == -2
+
+    # A death cross can precede the first golden cross when the short MA starts
+    # above the long MA after warm-up; drop those leading exits so the cumsum
+    # stays in {0, 1} instead of going negative and zeroing every later trade
+    entry_idx = np.flatnonzero(entries)
+    exits[:entry_idx[0] if entry_idx.size else len(exits)] = False
+
+    delta = np.zeros(close.shape[0], dtype=np.int8)
+    delta[1:][entries] = 1
+    delta[1:][exits] = -1
+    position = np.cumsum(delta).clip(0, 1)
+
+    returns = position[:-1] * np.diff(close) / close[:-1]
+    equity = cash * np.cumprod(1.0 + returns)
+
+    sharpe = None
+    if returns.std() > 0:
+        sharpe = float(np.sqrt(252) * returns.mean() / returns.std())
+
+    running_max = np.maximum.accumulate(equity)
+    drawdown = equity / running_max - 1.0
+    under = drawdown < 0
+    max_len = 0
+    if under.any():
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], under.view(np.int8), [0]))))
+        max_len = int((edges[1::2] - edges[::2]).max())
+
+    return {
+        'Sharpe Ratio': sharpe,
+        'Max Drawdown': float(-drawdown.min() * 100.0),
+        'Drawdown Period': max_len
+    }
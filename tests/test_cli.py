@@ -3,6 +3,7 @@ import json
 import pytest
 from click.testing import CliRunner
 from unittest import mock
+import numpy as np
 import pandas as pd
 from cli import cli  # Adjust the import based on your file structure
 
@@ -25,33 +26,39 @@ def runner():
     return CliRunner()
 
 ### Test for the `fetch` command ###
-@mock.patch('cli.yf.download')
-def test_fetch_command(mock_download, runner, tmp_path):
+@mock.patch('yfinance.download')
+def test_fetch_command(mock_download, runner, tmp_path, monkeypatch):
     # Arrange
     symbol = 'AAPL'
     start = '2021-01-01'
     end = '2021-01-05'
     output = tmp_path / 'output.csv'
-    
+
+    # Keep the parquet cache inside the test sandbox, not the real ~/.cache
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr('cli._CACHE_DIR', cache_dir)
+
     # Mock the yfinance download to return a sample DataFrame
     mock_download.return_value = create_sample_dataframe()
-    
+
     # Act
     result = runner.invoke(cli, ['fetch', '--symbol', symbol, '--start', start, '--end', end, '--output', str(output)])
-    
+
     # Assert
     assert result.exit_code == 0
     assert f'Data saved to {output}' in result.output
     # Check if the file was created
     assert output.exists()
+    # The download should have been cached for the next invocation
+    assert list(cache_dir.glob('*.parquet'))
     # Optionally, verify the contents
     df = pd.read_csv(output, index_col='Date', parse_dates=True)
     assert not df.empty
     assert list(df.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
 
 ### Test for the `indicator` command ###
-@mock.patch('cli.pd.read_csv')
-def test_indicator_command_SMA(mock_read_csv, runner, tmp_path):
+@mock.patch('cli._load_ohlcv')
+def test_indicator_command_SMA(mock_load_ohlcv, runner, tmp_path):
     # Arrange
     indicator_type = 'SMA'
     symbol = 'AAPL'
@@ -61,7 +68,7 @@ def test_indicator_command_SMA(mock_read_csv, runner, tmp_path):
     
     # Create and mock DataFrame
     df = create_sample_dataframe()
-    mock_read_csv.return_value = df.copy()
+    mock_load_ohlcv.return_value = df.copy()
     
     # Act
     result = runner.invoke(cli, [
@@ -86,9 +93,9 @@ def test_indicator_command_SMA(mock_read_csv, runner, tmp_path):
     pd.testing.assert_series_equal(output_df['SMA'], expected_sma.dropna(), check_names=False)
 
 ### Test for the `backtest` command ###
-@mock.patch('cli.bt.Cerebro')
-@mock.patch('cli.pd.read_csv')
-def test_backtest_command(mock_read_csv, mock_cerebro, runner, tmp_path):
+@mock.patch('backtrader.Cerebro')
+@mock.patch('cli._feed_array')
+def test_backtest_command(mock_feed_array, mock_cerebro, runner, tmp_path):
     # Arrange
     strategy = 'ma_crossover'
     symbol = 'AAPL'
@@ -96,9 +103,12 @@ def test_backtest_command(mock_read_csv, mock_cerebro, runner, tmp_path):
     output_dir = tmp_path / 'backtest_results'
     os.makedirs(output_dir, exist_ok=True)
     
-    # Mock DataFrame
+    # Mock the cached (datenum, OHLCV) feed array
     df = create_sample_dataframe()
-    mock_read_csv.return_value = df.copy()
+    arr = np.empty((len(df), 6), dtype=np.float64)
+    arr[:, 0] = np.arange(len(df), dtype=np.float64)
+    arr[:, 1:] = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+    mock_feed_array.return_value = arr
     
     # Mock Cerebro instance and its methods
     mock_cerebro_instance = mock.Mock()
@@ -128,13 +138,53 @@ def test_backtest_command(mock_read_csv, mock_cerebro, runner, tmp_path):
     assert data['Sharpe Ratio'] == 1.5
     assert data['Max Drawdown'] == -10
     assert data['Drawdown Period'] == 5
-    # Check if plot was attempted to be saved (since plot uses savefig)
-    plot_path = output_dir / f'{symbol}_backtest_plot.png'
-    mock_cerebro_instance.plot.assert_called_once()
+    # Plotting is opt-in; the default run should not render
+    mock_cerebro_instance.plot.assert_not_called()
+
+### Test for the `backtest-batch` command ###
+@mock.patch('cli.ProcessPoolExecutor')
+@mock.patch('cli._run_one')
+def test_backtest_batch_command(mock_run_one, mock_executor, runner, tmp_path):
+    # Arrange
+    manifest = tmp_path / 'manifest.json'
+    with open(manifest, 'w') as f:
+        json.dump({'AAPL': 'data/aapl.csv', 'MSFT': 'data/msft.csv'}, f)
+
+    mock_run_one.return_value = {'Sharpe Ratio': 1.5, 'Max Drawdown': -10, 'Drawdown Period': 5}
+    # Have the pool's map delegate to the builtin map so _run_one runs in-process
+    mock_executor.return_value.__enter__.return_value.map.side_effect = map
+
+    # Act
+    result = runner.invoke(cli, [
+        'backtest-batch',
+        '--strategy', 'ma_crossover',
+        '--manifest', str(manifest),
+        '--output', str(tmp_path)
+    ])
+
+    # Assert
+    assert result.exit_code == 0
+    assert 'AAPL: Sharpe Ratio 1.5' in result.output
+    assert 'MSFT: Sharpe Ratio 1.5' in result.output
+    assert mock_run_one.call_count == 2
+
+### Test for the vectorized MA crossover strategy ###
+def test_ma_crossover_vec_entry_after_leading_death_cross():
+    from strategies.ma_crossover_vec import run
+
+    # The short MA starts above the long MA, so the first signal after warm-up
+    # is a death cross; the later golden cross must still open a position
+    # (periods >= 2: TA-Lib rejects timeperiod=1)
+    close = np.array([10, 12, 14, 13, 9, 6, 5, 8, 10, 12, 13, 14], dtype=np.float64)
+    summary = run(close, short=2, long=3)
+
+    # The two up-bars after the golden cross yield positive returns
+    assert summary['Sharpe Ratio'] is not None
+    assert summary['Sharpe Ratio'] > 0
 
 ### Test for the `report` command ###
-@mock.patch('cli.Environment.get_template')
-@mock.patch('cli.HTML')
+@mock.patch('jinja2.Environment.get_template')
+@mock.patch('weasyprint.HTML')
 def test_report_command(mock_html, mock_get_template, runner, tmp_path):
     # Arrange
     portfolio = tmp_path / 'portfolio.json'
@@ -162,12 +212,36 @@ def test_report_command(mock_html, mock_get_template, runner, tmp_path):
     result = runner.invoke(cli, [
         'report',
         '--portfolio', str(portfolio),
-        '--output', str(output_pdf)
+        '--output', str(output_pdf),
+        '--format', 'pdf'
     ])
-    
+
     # Assert
     assert result.exit_code == 0
     assert f'Report generated at {output_pdf}' in result.output
     # Check if PDF was attempted to be written
     mock_html_instance.write_pdf.assert_called_once_with(str(output_pdf))
 
+@mock.patch('jinja2.Environment.get_template')
+def test_report_command_html_default(mock_get_template, runner, tmp_path):
+    # Arrange
+    portfolio = tmp_path / 'portfolio.json'
+    output_html = tmp_path / 'report.html'
+    with open(portfolio, 'w') as f:
+        json.dump({'Sharpe Ratio': 1.5}, f)
+
+    mock_template = mock.Mock()
+    mock_template.render.return_value = '<html>Report</html>'
+    mock_get_template.return_value = mock_template
+
+    # Act
+    result = runner.invoke(cli, [
+        'report',
+        '--portfolio', str(portfolio),
+        '--output', str(output_html)
+    ])
+
+    # Assert: the default format writes HTML without touching WeasyPrint
+    assert result.exit_code == 0
+    assert output_html.read_text() == '<html>Report</html>'
+